@@ -4,7 +4,6 @@ from discord.ext import commands
 import logging
 
 from src.config.settings import GUILD_ID
-from src.services.bot_llm import bot_response
 
 logger = logging.getLogger(__name__)
 
@@ -47,11 +46,15 @@ class StoryCog(commands.Cog):
 
         try:
             logger.debug("Sending prompt to LLM for story generation")
-            story: str = await bot_response(prompt=prompt)
-            logger.info(f"Story successfully generated for {interaction.user} (length: {len(story)} characters)")
-            await interaction.followup.send(story)
+            story: str | None = await self.bot.journaled_reply(
+                kind="story", channel_id=interaction.channel_id, prompt=prompt, send=interaction.followup.send
+            )
+            if story is None:
+                logger.warning(f"Story for {interaction.user} could not be sent yet, retrying from the journal")
+            else:
+                logger.info(f"Story successfully generated and sent to {interaction.user} (length: {len(story)} characters)")
         except Exception as e:
-            # Handle any errors that might occur during story generation
+            # Handle errors generating the story or replies Discord rejected, transient send failures are retried from the journal
             logger.error(f"Error generating story for {interaction.user}: {e}")
             await interaction.followup.send("Sorry, I encountered an error while generating your story. Please try again later.")
 
@@ -4,4 +4,11 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
-GUILD_ID = int(os.getenv("GUILD_ID"))
\ No newline at end of file
+GUILD_ID = int(os.getenv("GUILD_ID"))
+
+# Durable journal of in-flight and undelivered LLM generations
+JOURNAL_PATH = os.getenv("JOURNAL_PATH", "data/journal.db")
+# Unfinished generations older than this are not re-queued after a restart
+JOURNAL_DEADLINE_SECONDS = int(os.getenv("JOURNAL_DEADLINE_SECONDS", "900"))
+# Delivered, failed and expired generations are deleted from the journal after this long
+JOURNAL_RETENTION_SECONDS = int(os.getenv("JOURNAL_RETENTION_SECONDS", str(7 * 24 * 60 * 60)))
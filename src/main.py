@@ -1,6 +1,9 @@
 import os
+import asyncio
 import logging
 import sys
+import time
+from collections.abc import Awaitable, Callable
 
 from dotenv import load_dotenv
 
@@ -8,13 +11,19 @@ import discord
 from discord.ext import commands
 
 from src.utils.logging import setup_logging
-from src.config.settings import GUILD_ID
+from src.config.settings import GUILD_ID, JOURNAL_PATH, JOURNAL_DEADLINE_SECONDS, JOURNAL_RETENTION_SECONDS
 from src.services.bot_llm import bot_response
+from src.services.generation_journal import GenerationJournal, JournalEntry
 
 load_dotenv()
 setup_logging()
 logger = logging.getLogger(__name__)
 
+# Delay before retrying delivery after a live reply failed to send
+DELIVERY_RETRY_SECONDS = 30
+# Re-queued generations run one at a time so live requests aren't stuck behind a backlog
+REQUEUE_CONCURRENCY = 1
+
 class MyClient(commands.Bot):
 
     def __init__(self) -> None:
@@ -25,6 +34,22 @@ class MyClient(commands.Bot):
         super().__init__(command_prefix='!', intents=intents)
 
         self.guild = discord.Object(id=GUILD_ID)
+        self.journal = GenerationJournal(JOURNAL_PATH, retention_seconds=JOURNAL_RETENTION_SECONDS)
+        # journal entries currently being generated or sent, so recovery never duplicates them
+        self.in_flight: set[str] = set()
+        self._recovery_tasks: set[asyncio.Task] = set()
+        self._recovery_lock = asyncio.Lock()
+        self._requeue_slots = asyncio.Semaphore(REQUEUE_CONCURRENCY)
+        self._delivery_retry_pending = False
+
+    async def setup_hook(self):
+        await self.journal.open()
+
+    async def close(self):
+        await super().close()
+        for task in list(self._recovery_tasks):
+            task.cancel()
+        await self.journal.close()
 
     async def on_ready(self):
         logger.info(f"{self.user} ready for commands")
@@ -46,6 +71,12 @@ class MyClient(commands.Bot):
         except Exception as e:
             logger.error(f"Error syncing commands: {e}")
 
+        self.start_recovery()
+
+    async def on_resumed(self):
+        logger.info(f"{self.user} resumed discord session")
+        self.start_recovery()
+
     async def on_connect(self):
         logger.info(f"{self.user} connected to discord successfully")
 
@@ -58,15 +89,154 @@ class MyClient(commands.Bot):
         if self.user.mentioned_in(message):
             logger.info(f"{message.author} mentioned bot in {message.channel}")
             try:
-                response = await bot_response(prompt=message.content)
-                await message.channel.send(response)
-                logger.debug(f"Successfully responded to mention from {message.author}")
+                response = await self.journaled_reply(
+                    kind="mention", channel_id=message.channel.id, message_id=message.id,
+                    prompt=message.content, send=message.channel.send,
+                )
+                if response is None:
+                    logger.warning(f"Reply to {message.author} could not be sent yet, retrying from the journal")
+                else:
+                    logger.debug(f"Successfully responded to mention from {message.author}")
             except Exception as e:
+                # a reply that failed to send for a transient reason is retried from the journal instead
                 logger.error(f"Error responding to mention from {message.author}: {e}")
                 await message.channel.send("Sorry, I encountered an error while processing your message.")
         
         await self.process_commands(message)
 
+    async def journaled_reply(self, kind: str, channel_id: int, prompt: str,
+                              send: Callable[[str], Awaitable], message_id: int | None = None) -> str | None:
+        """Generate a response and send it, journaling both so neither is lost across restarts.
+
+        Returns the response once sent, or None if sending failed and delivery will be retried
+        from the journal instead of regenerating it. Generation errors and replies Discord
+        rejected outright are raised to the caller.
+        """
+        entry_id = self.journal.accept(
+            kind=kind, channel_id=channel_id, message_id=message_id, prompt=prompt,
+            deadline=time.time() + JOURNAL_DEADLINE_SECONDS,
+        )
+        self.in_flight.add(entry_id)
+        try:
+            response = await self._generate(entry_id, prompt)
+            try:
+                await send(response)
+            except Exception as e:
+                logger.error(f"Error sending reply {entry_id} to channel {channel_id}: {e}")
+                if self._is_rejected(e):
+                    self.journal.mark_failed(entry_id)
+                    raise
+                self._schedule_delivery_retry()
+                return None
+            self.journal.mark_delivered(entry_id)
+        finally:
+            self.in_flight.discard(entry_id)
+        return response
+
+    async def _generate(self, entry_id: str, prompt: str) -> str:
+        start_time = time.time()
+        try:
+            response = await bot_response(prompt=prompt)
+        except Exception:
+            self.journal.mark_failed(entry_id)
+            raise
+        self.journal.complete(entry_id, response, gpu_seconds=time.time() - start_time)
+        return response
+
+    def start_recovery(self, delay: float = 0) -> asyncio.Task:
+        """Run ``recover_journal`` in the background, optionally after a delay."""
+        task = asyncio.create_task(self._recover_after(delay))
+        self._recovery_tasks.add(task)
+        task.add_done_callback(self._recovery_tasks.discard)
+        return task
+
+    async def _recover_after(self, delay: float):
+        if delay:
+            await asyncio.sleep(delay)
+        await self.recover_journal()
+
+    def _schedule_delivery_retry(self):
+        if self._delivery_retry_pending:
+            return
+        self._delivery_retry_pending = True
+        self.start_recovery(DELIVERY_RETRY_SECONDS)
+
+    async def recover_journal(self):
+        """Send finished-but-undelivered replies, then re-queue unfinished ones still within their deadline."""
+        async with self._recovery_lock:
+            # this pass picks up every reply that failed to send so far
+            self._delivery_retry_pending = False
+            try:
+                undelivered = await self.journal.undelivered()
+                delivered = 0
+                for entry in undelivered:
+                    if not await self._claim(entry):
+                        continue
+                    try:
+                        if await self._deliver(entry, entry.response):
+                            self.journal.record_saved(entry)
+                            delivered += 1
+                    finally:
+                        self.in_flight.discard(entry.id)
+
+                # read only now so requests answered while the replies above were sent aren't regenerated
+                requeued = []
+                for entry in await self.journal.unfinished():
+                    if not await self._claim(entry):
+                        continue
+                    requeued.append(entry)
+                    task = asyncio.create_task(self._regenerate(entry))
+                    self._recovery_tasks.add(task)
+                    task.add_done_callback(self._recovery_tasks.discard)
+            except Exception as e:
+                logger.error(f"Error recovering generation journal: {e}")
+                return
+            if undelivered or requeued:
+                logger.info(f"Journal recovery: {delivered}/{len(undelivered)} undelivered replies sent, "
+                            f"{len(requeued)} re-queued")
+
+    async def _claim(self, entry: JournalEntry) -> bool:
+        """Mark a journal snapshot entry in-flight unless another path has handled it since the snapshot."""
+        if await self.journal.status(entry.id) != entry.status or entry.id in self.in_flight:
+            return False
+        self.in_flight.add(entry.id)
+        return True
+
+    async def _regenerate(self, entry: JournalEntry):
+        try:
+            async with self._requeue_slots:
+                response = await self._generate(entry.id, entry.prompt)
+            await self._deliver(entry, response)
+        except Exception as e:
+            logger.error(f"Error regenerating journaled request {entry.id}: {e}")
+        finally:
+            self.in_flight.discard(entry.id)
+
+    async def _deliver(self, entry: JournalEntry, response: str) -> bool:
+        try:
+            channel = self.get_channel(entry.channel_id) or await self.fetch_channel(entry.channel_id)
+            if entry.message_id is not None:
+                reference = discord.MessageReference(
+                    message_id=entry.message_id, channel_id=entry.channel_id, fail_if_not_exists=False
+                )
+                await channel.send(response, reference=reference)
+            else:
+                await channel.send(response)
+        except Exception as e:
+            logger.error(f"Error delivering journaled reply {entry.id} to channel {entry.channel_id}: {e}")
+            if self._is_rejected(e):
+                self.journal.mark_failed(entry.id)
+            else:
+                # leave the entry completed so a later recovery pass retries it
+                self._schedule_delivery_retry()
+            return False
+        self.journal.mark_delivered(entry.id)
+        return True
+
+    @staticmethod
+    def _is_rejected(error: Exception) -> bool:
+        # Discord refused the reply outright (too long, missing permissions...), retrying would never succeed
+        return isinstance(error, discord.HTTPException) and 400 <= error.status < 500
 
 
 def main():
@@ -0,0 +1,250 @@
+import asyncio
+import logging
+import os
+import sqlite3
+import time
+import uuid
+from dataclasses import dataclass
+
+logger = logging.getLogger(__name__)
+
+# Journal entry states
+ACCEPTED = "accepted"
+COMPLETED = "completed"
+DELIVERED = "delivered"
+FAILED = "failed"
+EXPIRED = "expired"
+TERMINAL_STATES = (DELIVERED, FAILED, EXPIRED)
+
+# Upper bound for the delay between retries while journal writes keep failing
+MAX_WRITE_BACKOFF = 30.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS generations (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    channel_id INTEGER NOT NULL,
+    message_id INTEGER,
+    prompt TEXT NOT NULL,
+    status TEXT NOT NULL,
+    response TEXT,
+    gpu_seconds REAL NOT NULL DEFAULT 0,
+    accepted_at REAL NOT NULL,
+    deadline REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_generations_status ON generations (status);
+"""
+
+
+@dataclass
+class JournalEntry:
+    id: str
+    kind: str
+    channel_id: int
+    message_id: int | None
+    prompt: str
+    status: str
+    response: str | None
+    gpu_seconds: float
+    accepted_at: float
+    deadline: float
+
+
+class GenerationJournal:
+    """SQLite (WAL) journal of accepted LLM requests and their finished responses.
+
+    Writes are queued in memory and flushed in batches from a worker thread so
+    the event loop never blocks on disk I/O. Delivered, failed and expired entries
+    are pruned once they are older than ``retention_seconds``.
+    """
+
+    def __init__(self, path: str, flush_interval: float = 0.05, batch_size: int = 64,
+                 retention_seconds: float = 7 * 24 * 60 * 60) -> None:
+        self.path = path
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.retention_seconds = retention_seconds
+        self.gpu_seconds_saved: float = 0.0
+        self._conn: sqlite3.Connection | None = None
+        self._pending: list[tuple[str, tuple]] = []
+        self._wake = asyncio.Event()
+        self._db_lock = asyncio.Lock()
+        self._writer_task: asyncio.Task | None = None
+        self._write_failing = False
+
+    async def open(self) -> None:
+        await asyncio.to_thread(self._connect)
+        await self.prune()
+        self._writer_task = asyncio.create_task(self._writer())
+        logger.info(f"Generation journal opened at {self.path}")
+
+    async def close(self) -> None:
+        if self._writer_task is not None:
+            self._writer_task.cancel()
+            try:
+                await self._writer_task
+            except asyncio.CancelledError:
+                pass
+            self._writer_task = None
+        try:
+            await self.flush()
+        except Exception:
+            # already logged in flush; whatever is still pending is lost
+            pass
+        if self._conn is not None:
+            async with self._db_lock:
+                await asyncio.to_thread(self._conn.close)
+            self._conn = None
+            logger.info(f"Generation journal closed - {self.gpu_seconds_saved:.2f} GPU-seconds saved this session")
+
+    def accept(self, kind: str, channel_id: int, prompt: str, deadline: float,
+               message_id: int | None = None) -> str:
+        entry_id = uuid.uuid4().hex
+        self._enqueue(
+            "INSERT INTO generations (id, kind, channel_id, message_id, prompt, status, accepted_at, deadline) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (entry_id, kind, channel_id, message_id, prompt, ACCEPTED, time.time(), deadline),
+        )
+        return entry_id
+
+    def complete(self, entry_id: str, response: str, gpu_seconds: float) -> None:
+        self._enqueue(
+            "UPDATE generations SET status = ?, response = ?, gpu_seconds = ? WHERE id = ?",
+            (COMPLETED, response, gpu_seconds, entry_id),
+        )
+
+    def mark_delivered(self, entry_id: str) -> None:
+        self._set_status(entry_id, DELIVERED)
+
+    def mark_failed(self, entry_id: str) -> None:
+        self._set_status(entry_id, FAILED)
+
+    def record_saved(self, entry: JournalEntry) -> None:
+        self.gpu_seconds_saved += entry.gpu_seconds
+        logger.info(f"Recovered reply {entry.id} without regeneration - saved {entry.gpu_seconds:.2f} GPU-seconds "
+                    f"({self.gpu_seconds_saved:.2f} total this session)")
+
+    async def undelivered(self, now: float | None = None) -> list[JournalEntry]:
+        """Entries whose response finished but never reached Discord, oldest first; expires those past their deadline."""
+        now = time.time() if now is None else now
+        await self._expire(COMPLETED, now)
+        return await self._query(
+            "SELECT * FROM generations WHERE status = ? AND deadline > ? ORDER BY accepted_at", (COMPLETED, now)
+        )
+
+    async def unfinished(self, now: float | None = None) -> list[JournalEntry]:
+        """Entries still awaiting a response and within their deadline; expires the rest."""
+        now = time.time() if now is None else now
+        await self._expire(ACCEPTED, now)
+        await self.prune(now)
+        return await self._query(
+            "SELECT * FROM generations WHERE status = ? AND deadline > ? ORDER BY accepted_at", (ACCEPTED, now)
+        )
+
+    async def status(self, entry_id: str) -> str | None:
+        """Current status of an entry, including writes that are still queued."""
+        await self.flush()
+        async with self._db_lock:
+            rows = await asyncio.to_thread(self._fetch, "SELECT status FROM generations WHERE id = ?", (entry_id,))
+        return rows[0]["status"] if rows else None
+
+    async def prune(self, now: float | None = None) -> int:
+        """Delete terminal entries older than the retention period, returning how many were removed."""
+        now = time.time() if now is None else now
+        async with self._db_lock:
+            removed = await asyncio.to_thread(self._prune, now - self.retention_seconds)
+        if removed:
+            logger.info(f"Pruned {removed} old generation journal entries")
+        return removed
+
+    async def flush(self) -> None:
+        if not self._pending or self._conn is None:
+            return
+        async with self._db_lock:
+            batch, self._pending = self._pending, []
+            try:
+                await asyncio.to_thread(self._write_batch, batch)
+            except Exception as e:
+                # log a persistent failure once rather than on every retry
+                if not self._write_failing:
+                    logger.error(f"Failed to write {len(batch)} journal operations, will keep retrying: {e}")
+                else:
+                    logger.debug(f"Journal write retry failed: {e}")
+                self._write_failing = True
+                self._pending = batch + self._pending
+                raise
+        if self._write_failing:
+            logger.info("Journal writes recovered")
+            self._write_failing = False
+        logger.debug(f"Flushed {len(batch)} journal operations")
+
+    async def _expire(self, status: str, now: float) -> None:
+        await self.flush()
+        async with self._db_lock:
+            await asyncio.to_thread(
+                self._write_batch,
+                [("UPDATE generations SET status = ? WHERE status = ? AND deadline <= ?", (EXPIRED, status, now))],
+            )
+
+    def _set_status(self, entry_id: str, status: str) -> None:
+        self._enqueue("UPDATE generations SET status = ? WHERE id = ?", (status, entry_id))
+
+    def _enqueue(self, sql: str, params: tuple) -> None:
+        self._pending.append((sql, params))
+        if len(self._pending) >= self.batch_size:
+            self._wake.set()
+
+    async def _writer(self) -> None:
+        delay = self.flush_interval
+        while True:
+            if self._write_failing:
+                # back off instead of waking for every new batch while the disk is unusable
+                await asyncio.sleep(delay)
+            else:
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+            self._wake.clear()
+            try:
+                await self.flush()
+                delay = self.flush_interval
+            except Exception:
+                # already logged in flush; the batch is retried on the next pass
+                delay = min(delay * 2, MAX_WRITE_BACKOFF)
+
+    async def _query(self, sql: str, params: tuple) -> list[JournalEntry]:
+        async with self._db_lock:
+            rows = await asyncio.to_thread(self._fetch, sql, params)
+        return [JournalEntry(**dict(row)) for row in rows]
+
+    # The methods below run in a worker thread
+
+    def _connect(self) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(SCHEMA)
+        conn.commit()
+        self._conn = conn
+
+    def _write_batch(self, batch: list[tuple[str, tuple]]) -> None:
+        with self._conn:
+            for sql, params in batch:
+                self._conn.execute(sql, params)
+
+    def _fetch(self, sql: str, params: tuple) -> list[sqlite3.Row]:
+        return self._conn.execute(sql, params).fetchall()
+
+    def _prune(self, cutoff: float) -> int:
+        placeholders = ", ".join("?" for _ in TERMINAL_STATES)
+        with self._conn:
+            cursor = self._conn.execute(
+                f"DELETE FROM generations WHERE status IN ({placeholders}) AND accepted_at < ?",
+                (*TERMINAL_STATES, cutoff),
+            )
+        return cursor.rowcount
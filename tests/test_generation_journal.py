@@ -0,0 +1,145 @@
+import asyncio
+import logging
+import sqlite3
+import time
+from unittest.mock import patch
+
+import pytest
+import pytest_asyncio
+from src.services.generation_journal import GenerationJournal, ACCEPTED, COMPLETED, EXPIRED
+
+
+@pytest_asyncio.fixture
+async def journal(tmp_path):
+    journal = GenerationJournal(str(tmp_path / "journal.db"))
+    await journal.open()
+    yield journal
+    await journal.close()
+
+# Tests that the journal is opened in WAL mode
+@pytest.mark.asyncio
+async def test_journal_uses_wal(journal):
+    mode = journal._conn.execute("PRAGMA journal_mode").fetchone()[0]
+    assert mode == "wal"
+
+# Tests that completed but undelivered responses are returned for redelivery
+@pytest.mark.asyncio
+async def test_undelivered_returns_completed_entries(journal):
+    entry_id = journal.accept(kind="mention", channel_id=1, message_id=2, prompt="Hi", deadline=time.time() + 60)
+    journal.complete(entry_id, "Hello!", gpu_seconds=3.5)
+
+    entries = await journal.undelivered()
+
+    assert len(entries) == 1
+    assert entries[0].id == entry_id
+    assert entries[0].status == COMPLETED
+    assert entries[0].response == "Hello!"
+    assert entries[0].gpu_seconds == 3.5
+
+# Tests that undelivered replies past their deadline expire instead of being retried forever
+@pytest.mark.asyncio
+async def test_undelivered_respects_deadline(journal):
+    now = time.time()
+    fresh = journal.accept(kind="mention", channel_id=1, prompt="Fresh", deadline=now + 60)
+    journal.complete(fresh, "Fresh reply", gpu_seconds=1.0)
+    stale = journal.accept(kind="mention", channel_id=1, prompt="Stale", deadline=now - 1)
+    journal.complete(stale, "Stale reply", gpu_seconds=1.0)
+
+    entries = await journal.undelivered(now=now)
+
+    assert [entry.id for entry in entries] == [fresh]
+    assert await journal.status(stale) == EXPIRED
+    assert await journal.prune(now=now + journal.retention_seconds + 1) == 1
+
+# Tests that delivered and failed entries are not recovered
+@pytest.mark.asyncio
+async def test_delivered_and_failed_entries_are_not_recovered(journal):
+    delivered = journal.accept(kind="mention", channel_id=1, prompt="Hi", deadline=time.time() + 60)
+    journal.complete(delivered, "Hello!", gpu_seconds=1.0)
+    journal.mark_delivered(delivered)
+    failed = journal.accept(kind="story", channel_id=1, prompt="Story", deadline=time.time() + 60)
+    journal.mark_failed(failed)
+
+    assert await journal.undelivered() == []
+    assert await journal.unfinished() == []
+
+# Tests that only unfinished entries within their deadline are re-queued
+@pytest.mark.asyncio
+async def test_unfinished_respects_deadline(journal):
+    now = time.time()
+    fresh = journal.accept(kind="mention", channel_id=1, prompt="Fresh", deadline=now + 60)
+    journal.accept(kind="mention", channel_id=1, prompt="Stale", deadline=now - 1)
+
+    entries = await journal.unfinished(now=now)
+
+    assert [entry.id for entry in entries] == [fresh]
+    assert entries[0].status == ACCEPTED
+    # expired entries stay expired even if the clock is wound back
+    assert len(await journal.unfinished(now=now - 10)) == 1
+
+# Tests that journaled entries survive reopening the database
+@pytest.mark.asyncio
+async def test_entries_survive_restart(tmp_path):
+    path = str(tmp_path / "journal.db")
+    journal = GenerationJournal(path)
+    await journal.open()
+    entry_id = journal.accept(kind="mention", channel_id=1, prompt="Hi", deadline=time.time() + 60)
+    journal.complete(entry_id, "Hello!", gpu_seconds=2.0)
+    await journal.close()
+
+    reopened = GenerationJournal(path)
+    await reopened.open()
+    entries = await reopened.undelivered()
+    reopened.record_saved(entries[0])
+    await reopened.close()
+
+    assert [entry.id for entry in entries] == [entry_id]
+    assert reopened.gpu_seconds_saved == 2.0
+
+# Tests that writes are batched and flushed in the background
+@pytest.mark.asyncio
+async def test_writes_are_flushed_in_background(journal):
+    journal.accept(kind="mention", channel_id=1, prompt="Hi", deadline=time.time() + 60)
+    assert journal._pending
+
+    await asyncio.sleep(journal.flush_interval * 4)
+
+    assert not journal._pending
+    count = journal._conn.execute("SELECT COUNT(*) FROM generations").fetchone()[0]
+    assert count == 1
+
+# Tests that old terminal entries are pruned while pending ones are kept
+@pytest.mark.asyncio
+async def test_prune_removes_old_terminal_entries(journal):
+    now = time.time()
+    delivered = journal.accept(kind="mention", channel_id=1, prompt="Hi", deadline=now + 60)
+    journal.mark_delivered(delivered)
+    failed = journal.accept(kind="mention", channel_id=1, prompt="Hi", deadline=now + 60)
+    journal.mark_failed(failed)
+    pending = journal.accept(kind="mention", channel_id=1, prompt="Hi", deadline=now + 60)
+    await journal.flush()
+
+    assert await journal.prune(now=now) == 0
+    assert await journal.prune(now=now + journal.retention_seconds + 1) == 2
+
+    ids = [row[0] for row in journal._conn.execute("SELECT id FROM generations")]
+    assert ids == [pending]
+
+# Tests that a persistent write failure is logged once and retried with backoff
+@pytest.mark.asyncio
+async def test_write_failure_logged_once_with_backoff(journal, caplog):
+    caplog.set_level(logging.INFO, logger="src.services.generation_journal")
+    with patch.object(journal, "_write_batch", side_effect=sqlite3.OperationalError("disk full")) as write_batch:
+        journal.accept(kind="mention", channel_id=1, prompt="Hi", deadline=time.time() + 60)
+        await asyncio.sleep(journal.flush_interval * 10)
+
+        errors = [record for record in caplog.records if record.levelno == logging.ERROR]
+        assert len(errors) == 1
+        # without backoff the writer would have retried about 10 times
+        assert write_batch.call_count <= 5
+        assert journal._pending
+
+    await journal.flush()
+
+    assert not journal._pending
+    assert "Journal writes recovered" in caplog.text
@@ -0,0 +1,290 @@
+import asyncio
+import os
+from unittest.mock import AsyncMock, MagicMock, PropertyMock
+
+import discord
+import pytest
+import pytest_asyncio
+
+os.environ.setdefault("GUILD_ID", "0")
+
+from src.main import MyClient, DELIVERY_RETRY_SECONDS, REQUEUE_CONCURRENCY
+from src.services.generation_journal import GenerationJournal, ACCEPTED, COMPLETED, DELIVERED, FAILED
+
+
+@pytest_asyncio.fixture
+async def client(tmp_path):
+    client = MyClient()
+    client.journal = GenerationJournal(str(tmp_path / "journal.db"))
+    await client.journal.open()
+    yield client
+    for task in list(client._recovery_tasks):
+        task.cancel()
+    await client.journal.close()
+
+
+@pytest.fixture
+def channel(client, mocker):
+    channel = MagicMock()
+    channel.send = AsyncMock()
+    mocker.patch.object(client, "get_channel", return_value=channel)
+    return channel
+
+
+async def wait_until(predicate):
+    async def poll():
+        while not predicate():
+            await asyncio.sleep(0.001)
+    await asyncio.wait_for(poll(), timeout=1)
+
+
+def http_error(status):
+    return discord.HTTPException(MagicMock(status=status, reason="Error"), "Discord error")
+
+
+async def status_of(journal, entry_id):
+    await journal.flush()
+    return journal._conn.execute("SELECT status FROM generations WHERE id = ?", (entry_id,)).fetchone()[0]
+
+
+async def completed_entry(journal, channel_id=1, response="Hello!"):
+    entry_id = journal.accept(kind="mention", channel_id=channel_id, prompt="Hi", deadline=9e18)
+    journal.complete(entry_id, response, gpu_seconds=2.0)
+    return next(entry for entry in await journal.undelivered() if entry.id == entry_id)
+
+# Tests that a reply whose send failed is kept and redelivered without regenerating it
+@pytest.mark.asyncio
+async def test_failed_send_keeps_reply_for_redelivery(client, channel, mocker):
+    mock_bot_response = mocker.patch("src.main.bot_response", AsyncMock(return_value="Hello!"))
+    mock_start_recovery = mocker.patch.object(client, "start_recovery")
+    send = AsyncMock(side_effect=http_error(503))
+
+    response = await client.journaled_reply(kind="mention", channel_id=1, message_id=2, prompt="Hi", send=send)
+
+    assert response is None
+    [entry] = await client.journal.undelivered()
+    assert entry.status == COMPLETED
+    mock_start_recovery.assert_called_once_with(DELIVERY_RETRY_SECONDS)
+
+    await client.recover_journal()
+
+    channel.send.assert_awaited_once()
+    assert channel.send.await_args.args == ("Hello!",)
+    mock_bot_response.assert_awaited_once()
+    assert await status_of(client.journal, entry.id) == DELIVERED
+
+# Tests that a live send Discord rejects is marked failed, never retried and raised to the caller
+@pytest.mark.asyncio
+async def test_rejected_live_send_marks_failed(client, mocker):
+    mocker.patch("src.main.bot_response", AsyncMock(return_value="x" * 3000))
+    mock_start_recovery = mocker.patch.object(client, "start_recovery")
+
+    with pytest.raises(discord.HTTPException):
+        await client.journaled_reply(
+            kind="mention", channel_id=1, prompt="Hi", send=AsyncMock(side_effect=http_error(400))
+        )
+
+    assert client.in_flight == set()
+    assert await client.journal.undelivered() == []
+    mock_start_recovery.assert_not_called()
+
+# Tests that the user still gets an apology when Discord rejects the reply
+@pytest.mark.asyncio
+async def test_on_message_apologizes_for_rejected_reply(client, mocker):
+    mocker.patch("src.main.bot_response", AsyncMock(return_value="x" * 3000))
+    mocker.patch.object(MyClient, "user", new_callable=PropertyMock)
+    mocker.patch.object(client, "process_commands", AsyncMock())
+    message = MagicMock()
+    message.content = "Tell me everything"
+    message.channel.send = AsyncMock(side_effect=[http_error(400), None])
+
+    await client.on_message(message)
+
+    assert message.channel.send.await_count == 2
+    assert message.channel.send.await_args.args == ("Sorry, I encountered an error while processing your message.",)
+
+# Tests that a transient send failure is retried from the journal without an apology
+@pytest.mark.asyncio
+async def test_on_message_transient_send_failure_is_not_apologized(client, mocker):
+    mocker.patch("src.main.bot_response", AsyncMock(return_value="Hello!"))
+    mocker.patch.object(MyClient, "user", new_callable=PropertyMock)
+    mocker.patch.object(client, "process_commands", AsyncMock())
+    mock_start_recovery = mocker.patch.object(client, "start_recovery")
+    message = MagicMock()
+    message.content = "Hi"
+    message.channel.send = AsyncMock(side_effect=http_error(503))
+
+    await client.on_message(message)
+
+    message.channel.send.assert_awaited_once_with("Hello!")
+    mock_start_recovery.assert_called_once_with(DELIVERY_RETRY_SECONDS)
+
+# Tests that generation errors reach the caller and nothing is sent
+@pytest.mark.asyncio
+async def test_generation_error_is_raised(client, mocker):
+    mocker.patch("src.main.bot_response", AsyncMock(side_effect=ConnectionError("Ollama down")))
+    send = AsyncMock()
+
+    with pytest.raises(ConnectionError):
+        await client.journaled_reply(kind="mention", channel_id=1, prompt="Hi", send=send)
+
+    send.assert_not_awaited()
+    assert client.in_flight == set()
+    assert await client.journal.undelivered() == []
+    assert await client.journal.unfinished() == []
+
+# Tests that Discord rejections mark the entry failed while transient errors keep it for retry
+@pytest.mark.asyncio
+@pytest.mark.parametrize("error, expected_status", [
+    (http_error(400), FAILED),
+    (http_error(403), FAILED),
+    (http_error(404), FAILED),
+    (http_error(500), COMPLETED),
+    (http_error(503), COMPLETED),
+    (OSError("Connection reset"), COMPLETED),
+])
+async def test_deliver_error_handling(client, channel, mocker, error, expected_status):
+    mock_start_recovery = mocker.patch.object(client, "start_recovery")
+    entry = await completed_entry(client.journal)
+    channel.send.side_effect = error
+
+    assert await client._deliver(entry, entry.response) is False
+    assert await status_of(client.journal, entry.id) == expected_status
+    # transient failures schedule a retry, rejections don't
+    assert mock_start_recovery.called == (expected_status == COMPLETED)
+
+# Tests that recovery skips entries that are already being handled
+@pytest.mark.asyncio
+async def test_recovery_skips_in_flight_entries(client, channel):
+    busy = await completed_entry(client.journal, response="Busy")
+    idle = await completed_entry(client.journal, response="Idle")
+    client.in_flight.add(busy.id)
+
+    await client.recover_journal()
+
+    channel.send.assert_awaited_once()
+    assert channel.send.await_args.args == ("Idle",)
+    assert await status_of(client.journal, busy.id) == COMPLETED
+    assert await status_of(client.journal, idle.id) == DELIVERED
+
+# Tests that undelivered replies are sent before unfinished requests are regenerated
+@pytest.mark.asyncio
+async def test_recovery_sends_undelivered_before_requeued(client, channel, mocker):
+    events = []
+    channel.send.side_effect = lambda response, **kwargs: events.append(f"send {response}")
+
+    async def fake_bot_response(prompt):
+        events.append("generate")
+        return "Regenerated"
+
+    mocker.patch("src.main.bot_response", fake_bot_response)
+    client.journal.accept(kind="story", channel_id=1, prompt="Story", deadline=9e18)
+    await completed_entry(client.journal, response="Stored")
+
+    await client.recover_journal()
+    await asyncio.gather(*client._recovery_tasks)
+
+    assert events == ["send Stored", "generate", "send Regenerated"]
+
+# Tests that saved GPU time is only recorded for replies that were actually delivered
+@pytest.mark.asyncio
+async def test_record_saved_only_on_successful_delivery(client, channel, mocker):
+    record_saved = mocker.spy(client.journal, "record_saved")
+    entry = await completed_entry(client.journal)
+    channel.send.side_effect = http_error(503)
+
+    await client.recover_journal()
+    record_saved.assert_not_called()
+
+    channel.send.side_effect = None
+    await client.recover_journal()
+    record_saved.assert_called_once()
+    assert record_saved.call_args.args[0].id == entry.id
+    assert client.journal.gpu_seconds_saved == 2.0
+
+# Tests that a live reply sent while recovery is busy is not posted again by recovery
+@pytest.mark.asyncio
+async def test_live_send_overlapping_recovery_is_not_duplicated(client, channel, mocker):
+    sent = []
+    release_leftover = asyncio.Event()
+    release_live = asyncio.Event()
+
+    async def channel_send(response, **kwargs):
+        sent.append(response)
+        if response == "Leftover":
+            await release_leftover.wait()
+
+    async def live_send(response):
+        sent.append(response)
+        await release_live.wait()
+
+    channel.send.side_effect = channel_send
+    mocker.patch("src.main.bot_response", AsyncMock(return_value="Live"))
+    await completed_entry(client.journal, response="Leftover")
+
+    live = asyncio.create_task(client.journaled_reply(kind="mention", channel_id=1, prompt="Hi", send=live_send))
+    await wait_until(lambda: "Live" in sent)
+    recovery = asyncio.create_task(client.recover_journal())
+    await wait_until(lambda: "Leftover" in sent)
+    release_live.set()
+    await live
+    release_leftover.set()
+    await recovery
+
+    assert sent == ["Live", "Leftover"]
+
+# Tests that overlapping recoveries never post the same reply twice
+@pytest.mark.asyncio
+async def test_concurrent_recovery_delivers_once(client, channel):
+    await completed_entry(client.journal)
+
+    await asyncio.gather(client.recover_journal(), client.recover_journal())
+
+    channel.send.assert_awaited_once()
+
+# Tests that re-queued requests are generated with bounded concurrency
+@pytest.mark.asyncio
+async def test_requeued_generations_are_bounded(client, channel, mocker):
+    running = 0
+    peak = 0
+
+    async def fake_bot_response(prompt):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return prompt
+
+    mocker.patch("src.main.bot_response", fake_bot_response)
+    for i in range(5):
+        client.journal.accept(kind="mention", channel_id=1, prompt=f"Prompt {i}", deadline=9e18)
+
+    await client.recover_journal()
+    await asyncio.gather(*client._recovery_tasks)
+
+    assert channel.send.await_count == 5
+    assert peak == REQUEUE_CONCURRENCY
+
+# Tests that regeneration always releases its in-flight marker
+@pytest.mark.asyncio
+@pytest.mark.parametrize("outcome", [AsyncMock(return_value="Hello!"), AsyncMock(side_effect=ConnectionError("down"))])
+async def test_regenerate_clears_in_flight(client, channel, mocker, outcome):
+    mocker.patch("src.main.bot_response", outcome)
+    client.journal.accept(kind="mention", channel_id=1, prompt="Hi", deadline=9e18)
+    [entry] = await client.journal.unfinished()
+    assert entry.status == ACCEPTED
+    client.in_flight.add(entry.id)
+
+    await client._regenerate(entry)
+
+    assert entry.id not in client.in_flight
+
+# Tests that recovery runs again when the gateway session resumes
+@pytest.mark.asyncio
+async def test_resumed_session_starts_recovery(client, mocker):
+    mock_start_recovery = mocker.patch.object(client, "start_recovery")
+
+    await client.on_resumed()
+
+    mock_start_recovery.assert_called_once_with()